@@ -1,18 +1,25 @@
 import os
 import asyncio
-import requests
-import threading
+import aiohttp
+import fcntl
 import random
 import sys
-import atexit
 import re
-import psutil
-import socket
 import time
+import queue
+import atexit
+import signal
 import openai  # Added for AI conversations
-from openai import OpenAI
-from flask import Flask
-from tenacity import retry, stop_after_attempt, wait_exponential
+from openai import AsyncOpenAI
+import hmac
+import secrets
+from aiohttp import web
+from tenacity import (
+    retry,
+    retry_if_exception_type,
+    stop_after_attempt,
+    wait_exponential
+)
 from telegram import Update, ReplyKeyboardMarkup
 from telegram.ext import (
     Application,
@@ -20,26 +27,53 @@ from telegram.ext import (
     MessageHandler,
     filters,
     ContextTypes,
-    ConversationHandler,
-    Updater
+    ConversationHandler
 )
+import json
 import logging
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
 
-# Configure logging
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Configure logging: records go onto an in-process queue and a background
+# listener drains them to the stream/file handlers, so log I/O (write +
+# flush syscalls) never runs on the event-loop thread
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_stream_handler = logging.StreamHandler()
+_stream_handler.setFormatter(_log_formatter)
+_file_handler = logging.FileHandler('bot.log')
+_file_handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
 logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     level=logging.INFO,
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('bot.log')
-    ]
+    handlers=[QueueHandler(_log_queue)]
 )
+_log_listener = QueueListener(_log_queue, _stream_handler, _file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # --- Constants ---
+# Environment is read exactly once, here; everything else uses these bindings
+REQUIRED_ENV_VARS = ("TELEGRAM_BOT_TOKEN", "API_BIBLE_KEY", "OPENAI_API_KEY")
 TELEGRAM_BOT_TOKEN = os.getenv("TELEGRAM_BOT_TOKEN")
 API_BIBLE_KEY = os.getenv("API_BIBLE_KEY")
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")  # New for AI conversations
+PORT = int(os.environ.get("PORT", 10000))
+VERSE_CACHE_PATH = "verse_cache.json"
+# Public base URL (e.g. the Render service URL); when set, updates arrive
+# via webhook instead of polling
+WEBHOOK_URL = os.getenv("WEBHOOK_URL")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET") or secrets.token_urlsafe(32)
 WAITING_FOR_EMOTION = 1
 GENERAL_CONVERSATION = 2  # New state for AI conversations
 LOCKFILE_PATH = "/tmp/bot.lock"
@@ -48,8 +82,77 @@ LOCKFILE_PATH = "/tmp/bot.lock"
 API_BIBLE_URL = "https://api.scripture.api.bible/v1/bibles"
 DEFAULT_BIBLE_ID = "de4e12af7f28f599-01"
 
-# Initialize OpenAI
-client = OpenAI(api_key= "OPENAI_API_KEY")
+# Compiled once; strips HTML tags from API.Bible passage content
+_TAG_RE = re.compile(r'<[^>]+>')
+
+# OpenAI client, constructed lazily on first use so startup (and code
+# paths that never talk to OpenAI) don't pay for it
+_openai_client = None
+
+def get_openai_client():
+    global _openai_client
+    if _openai_client is None:
+        _openai_client = AsyncOpenAI(api_key=OPENAI_API_KEY)
+    return _openai_client
+
+# Shared aiohttp session, created in post_init and closed in post_stop
+http_session = None
+
+# Set by run_bot so the webhook route can hand updates to the bot
+telegram_app = None
+
+# aiohttp web server runner, started in post_init
+web_runner = None
+
+# In-memory verse cache; verse text is immutable so entries never expire
+_verse_cache = {}
+_verse_cache_lock = asyncio.Lock()
+
+# Bound concurrent Bible API calls so retries and warmup fan-out back off
+# instead of hammering the server during overload
+_api_semaphore = asyncio.Semaphore(20)
+
+# Ceiling on simultaneous OpenAI calls so a burst of users doesn't trip the
+# org rate limit and stretch tail latency with 429 retries
+_openai_semaphore = asyncio.Semaphore(8)
+
+# LRU cache for AI replies keyed by normalized prompt; repeat prompts like
+# "hello" or "thank you" skip the completion call entirely
+_AI_CACHE_SIZE = 1024
+_AI_CACHE_TTL = 3600
+_ai_cache = OrderedDict()
+_ai_cache_lock = asyncio.Lock()
+_PROMPT_WS_RE = re.compile(r'\s+')
+
+def _normalize_prompt(prompt):
+    """Collapse whitespace and case so trivial variants share a cache key"""
+    return _PROMPT_WS_RE.sub(' ', prompt.strip().lower())
+
+def ai_cache_key(model, prompt):
+    """Cache/single-flight key; includes the model so replies generated
+    for one model are never served or coalesced for another"""
+    return (model, _normalize_prompt(prompt))
+
+async def ai_cache_get(key):
+    """Return a cached AI reply or None if absent/expired"""
+    async with _ai_cache_lock:
+        entry = _ai_cache.get(key)
+        if entry is None:
+            return None
+        timestamp, text = entry
+        if time.monotonic() - timestamp > _AI_CACHE_TTL:
+            del _ai_cache[key]
+            return None
+        _ai_cache.move_to_end(key)
+        return text
+
+async def ai_cache_put(key, text):
+    """Store an AI reply, evicting the least recently used entry if full"""
+    async with _ai_cache_lock:
+        _ai_cache[key] = (time.monotonic(), text)
+        _ai_cache.move_to_end(key)
+        if len(_ai_cache) > _AI_CACHE_SIZE:
+            _ai_cache.popitem(last=False)
 # Dictionary of emotions and Bible references
 bible_references = {
     "sad": ["Psalm 34:18", "Matthew 11:28", "Matthew 5:4", "Psalm 147:3"],
@@ -69,130 +172,270 @@ bible_references = {
     "doubtful": ["Mark 9:24", "James 1:6", "Matthew 21:21"]
 }
 
-# Flask app for health checks
-app = Flask(__name__)
+# Immutable per-emotion reference tuples; random.choice on a tuple avoids
+# touching a mutable list in the hot path
+_EMOTION_REFS = {e: tuple(refs) for e, refs in bible_references.items()}
 
-@app.route('/')
-def health_check():
-    return "OK", 200
+# Dedicated RNG instance so verse picks skip the random module's global state
+_RNG = random.Random()
 
-@atexit.register
-def global_cleanup():
-    """Global cleanup handler"""
-    logger.info("🛑 Running global cleanup")
-    try:
-        asyncio.run(cleanup_lock())
-    except:
-        pass
-        
-def check_port(port):
-    """Check if port is available"""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        return s.connect_ex(('localhost', port)) != 0
-        
-def run_flask():
-    """Run Flask server with dynamic port handling"""
-    port = int(os.environ.get("PORT", 10000))
-    try:
-        app.run(host='0.0.0.0', port=port)
-    except OSError as e:
-        logger.error(f"Failed to start Flask: {e}")
+# Explanation lines are fixed per emotion, so render them once at import
+_EMOTION_MESSAGES = {
+    e: f"This verse reminds us that {e} is natural, but God is with us."
+    for e in bible_references
+}
+
+# Static keyboards, built once instead of per message
+MAIN_MENU_KEYBOARD = ReplyKeyboardMarkup(
+    keyboard=[
+        ["1. Get verse", "2. Talk"],  # Numeric options like in image
+        ["3. Help", "4. Cancel"]
+    ],
+    one_time_keyboard=True,
+    resize_keyboard=True
+)
+_EMOTION_LABELS = tuple(e.title() for e in bible_references)
+EMOTION_KEYBOARD = ReplyKeyboardMarkup(
+    [_EMOTION_LABELS[i:i + 3] for i in range(0, len(_EMOTION_LABELS), 3)],
+    one_time_keyboard=True,
+    resize_keyboard=True
+)
+CHOICE_KEYBOARD = ReplyKeyboardMarkup(
+    [["I need a verse"], ["I want to talk"]],
+    one_time_keyboard=True
+)
+CANCEL_KEYBOARD = ReplyKeyboardMarkup([["/cancel"]], one_time_keyboard=True)
+YES_NO_KEYBOARD = ReplyKeyboardMarkup([["Yes", "No"]], one_time_keyboard=True)
+
+# One system prompt constant shared by every completion call: an identical
+# prefix lets the provider's automatic prompt caching engage across requests
+SYSTEM_PROMPT = (
+    "You are a compassionate Christian counselor. Respond with:\n"
+    '1. Relevant Bible verses (use format "Book Chapter:Verse")\n'
+    "2. Practical advice\n"
+    "3. Follow-up questions\n"
+    "Be kind, concise, and scripture-focused."
+)
 
-async def enforce_single_instance():
-    """More robust instance checking"""
-    current_pid = os.getpid()
+# Composite filter shared by all message handlers, built once
+TEXT_NO_COMMAND = filters.TEXT & ~filters.COMMAND
+
+# Single-pass scanner matching any emotion keyword in free text
+_EMOTION_RE = re.compile(
+    r'\b(' + '|'.join(map(re.escape, bible_references)) + r')\b'
+)
+
+def match_emotion(text):
+    """Return the first emotion keyword found in the text, if any
+
+    Empty and very long messages are rejected up front — nobody picks an
+    emotion with a 10KB paste, so don't scan one.
+    """
+    if not text or len(text) > 256:
+        return None
+    match = _EMOTION_RE.search(text)
+    return match.group(1) if match else None
+
+# Strong references to fire-and-forget tasks; the event loop alone only
+# keeps weak ones, so an untracked task can be garbage-collected mid-run
+_background_tasks = set()
+
+def fire_and_forget(coro, what):
+    """Run a coroutine in the background, logging (not raising) failures"""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+
+    def _done(t):
+        _background_tasks.discard(t)
+        if not t.cancelled() and t.exception():
+            logger.error(f"{what} failed: {t.exception()}")
+
+    task.add_done_callback(_done)
+    return task
+
+# Web endpoints served on the bot's own event loop
+async def health_check(request):
+    return web.Response(text="OK")
+
+async def telegram_webhook(request):
+    """Receive pushed updates from Telegram and hand them to the bot"""
+    token = request.headers.get('X-Telegram-Bot-Api-Secret-Token') or ""
+    if not hmac.compare_digest(token, WEBHOOK_SECRET):
+        return web.Response(status=403, text="Forbidden")
+    if telegram_app is None:
+        return web.Response(status=503, text="Not ready")
+    update = Update.de_json(await request.json(loads=json_loads), telegram_app.bot)
+    # PTB tracks this task and routes its exceptions through error_handler
+    telegram_app.create_task(telegram_app.process_update(update), update=update)
+    return web.Response(text="OK")
+
+async def start_web_server():
+    """Serve health checks and the webhook without a separate thread"""
+    global web_runner
+    web_app = web.Application()
+    web_app.router.add_get('/', health_check)
+    web_app.router.add_post('/webhook', telegram_webhook)
+    web_runner = web.AppRunner(web_app)
+    await web_runner.setup()
+    site = web.TCPSite(web_runner, '0.0.0.0', PORT)
+    await site.start()
+    logger.info(f"🌐 Web server listening on port {PORT}")
+
+# Held open for the process lifetime; the kernel drops the lock on exit
+_lock_fd = None
+
+def acquire_instance_lock():
+    """Atomically claim the single-instance lock via flock"""
+    global _lock_fd
+    if _lock_fd is not None:
+        return True
     try:
-        if os.path.exists(LOCKFILE_PATH):
-            with open(LOCKFILE_PATH, 'r') as f:
-                pid_str = f.read().strip()
-                if pid_str and pid_str.isdigit():
-                    existing_pid = int(pid_str)
-                    # Check if process exists AND isn't ourselves
-                    if existing_pid != current_pid and psutil.pid_exists(existing_pid):
-                        try:
-                            # Send SIGTERM to the existing process
-                            os.kill(existing_pid, 15)
-                            logger.warning(f"Terminated duplicate instance (PID: {existing_pid})")
-                        except:
-                            logger.warning(f"Found stale lockfile from PID: {existing_pid}")
-                        os.remove(LOCKFILE_PATH)
-        
-        # Create new lockfile
-        with open(LOCKFILE_PATH, 'w') as f:
-            f.write(str(current_pid))
+        fd = os.open(LOCKFILE_PATH, os.O_CREAT | os.O_RDWR)
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        os.ftruncate(fd, 0)
+        os.write(fd, str(os.getpid()).encode())
+        _lock_fd = fd
         return True
-    except Exception as e:
+    except BlockingIOError:
+        logger.error("Instance lock is held by another process")
+        return False
+    except OSError as e:
         logger.error(f"Instance check failed: {e}")
         return False
 
-def ensure_single_instance(port=5000):
-    """Ensure only one instance runs"""
-    max_retries = 5
-    for _ in range(max_retries):
-        if check_port(port):
-            return True
-        time.sleep(2)
-    return False
-
-async def cleanup_lock():
-    """Safe lock removal"""
-    try:
-        if os.path.exists(LOCKFILE_PATH):
-            with open(LOCKFILE_PATH, 'r') as f:
-                if f.read().strip() == str(os.getpid()):
-                    os.remove(LOCKFILE_PATH)
-                    logger.info("🔒 Lock released")
-    except Exception as e:
-        logger.error(f"Lock cleanup error: {e}")
-
 # --- Helper Functions ---
-def fetch_bible_verse(reference):
-    """Fetch Bible verse from API"""
-    try:
-        response = requests.get(
+@retry(stop=stop_after_attempt(3),
+       wait=wait_exponential(multiplier=1, min=1, max=8),
+       retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)))
+async def _request_verse(reference):
+    """Single Bible API request, retried with exponential backoff"""
+    async with _api_semaphore:
+        async with http_session.get(
             f"{API_BIBLE_URL}/{DEFAULT_BIBLE_ID}/search",
             headers={"api-key": API_BIBLE_KEY},
-            params={"query": reference, "limit": 1},
-            timeout=10
-        )
-        response.raise_for_status()
-        data = response.json()
-        
-        if data.get('data', {}).get('passages'):
-            html_content = data['data']['passages'][0]['content']
-            clean_text = re.sub(r'<[^>]+>', '', html_content)
-            return ' '.join(clean_text.split())
+            params={"query": reference, "limit": 1}
+        ) as response:
+            response.raise_for_status()
+            return json_loads(await response.read())
+
+async def fetch_bible_verse(reference):
+    """Fetch Bible verse from API, serving repeats from the in-memory cache"""
+    cached = _verse_cache.get(reference)
+    if cached is not None:
+        return cached
+    try:
+        data = await _request_verse(reference)
+
+        passages = data.get('data', {}).get('passages')
+        if passages:
+            html_content = passages[0]['content']
+            clean_text = _TAG_RE.sub('', html_content)
+            verse_text = ' '.join(clean_text.split())
+            async with _verse_cache_lock:
+                _verse_cache[reference] = verse_text
+            return verse_text
     except Exception as e:
         logger.error(f"API Error: {e}")
     return None
 
-def get_bible_verse(emotion):
+def _load_verse_cache():
+    """Seed the in-memory cache from disk so restarts start hot"""
+    try:
+        if os.path.exists(VERSE_CACHE_PATH):
+            with open(VERSE_CACHE_PATH, 'r') as f:
+                _verse_cache.update(json.load(f))
+            logger.info(f"💾 Loaded {len(_verse_cache)} cached verses from disk")
+    except Exception as e:
+        logger.error(f"Verse cache load error: {e}")
+
+def _save_verse_cache():
+    """Write the in-memory cache to disk"""
+    try:
+        with open(VERSE_CACHE_PATH, 'w') as f:
+            json.dump(_verse_cache, f)
+    except Exception as e:
+        logger.error(f"Verse cache save error: {e}")
+
+async def warm_verse_cache():
+    """Prefetch every known reference so users never wait on a cold cache"""
+    refs = {r for verses in bible_references.values() for r in verses}
+    results = await asyncio.gather(
+        *(fetch_bible_verse(r) for r in refs),
+        return_exceptions=True
+    )
+    fetched = sum(1 for r in results if isinstance(r, str))
+    logger.info(f"🔥 Verse cache warmed: {fetched}/{len(refs)} references")
+    await asyncio.to_thread(_save_verse_cache)
+
+async def get_bible_verse(emotion):
     """Get random Bible verse for given emotion"""
-    if emotion in bible_references:
-        reference = random.choice(bible_references[emotion])
-        verse_text = fetch_bible_verse(reference)
+    refs = _EMOTION_REFS.get(emotion)
+    if refs:
+        reference = _RNG.choice(refs)
+        verse_text = await fetch_bible_verse(reference)
         if verse_text:
-            return verse_text, f"This verse reminds us that {emotion} is natural, but God is with us."
+            return verse_text, _EMOTION_MESSAGES[emotion]
     return (
         "John 16:33 - In this world you will have trouble. But take heart! I have overcome the world.",
         "This verse reminds us that Jesus has overcome the world's challenges."
     )
 
+@retry(stop=stop_after_attempt(3),
+       wait=wait_exponential(multiplier=0.2, min=0.2, max=2),
+       retry=retry_if_exception_type(openai.APIError))
+async def _request_chat_completion(model, messages, max_tokens):
+    """Single chat-completion request, retried with exponential backoff"""
+    async with _openai_semaphore:
+        response = await get_openai_client().chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=0.7,
+            max_tokens=max_tokens,
+            timeout=10.0
+        )
+    return response.choices[0].message.content
+
+# In-flight completion tasks keyed by normalized prompt, so concurrent
+# identical prompts share one upstream call instead of fanning out
+_ai_inflight = {}
+
+async def request_chat_completion(cache_key, model, messages, max_tokens):
+    """Single-flight front for _request_chat_completion
+
+    Concurrent callers with the same cache key await the first caller's
+    task; shield keeps one waiter's cancellation from killing the rest.
+    """
+    existing = _ai_inflight.get(cache_key)
+    if existing is not None:
+        return await asyncio.shield(existing)
+    task = asyncio.ensure_future(
+        _request_chat_completion(model, messages, max_tokens)
+    )
+    _ai_inflight[cache_key] = task
+    try:
+        return await task
+    finally:
+        _ai_inflight.pop(cache_key, None)
+
 async def generate_ai_response(prompt):
     """Generate AI response using OpenAI"""
+    cache_key = ai_cache_key("gpt-4", prompt)
+    cached = await ai_cache_get(cache_key)
+    if cached is not None:
+        return cached
     try:
-        response = await client.chat.completions.create(
+        ai_response = await request_chat_completion(
+            cache_key,
             model="gpt-4",
             messages=[
-                {"role": "system", "content": "You are a compassionate Christian counselor. Provide biblical wisdom and comfort in your responses."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
-            temperature=0.7,
-            max_tokens=500,
-            timeout=10.0
+            max_tokens=250
         )
-        return response.choices[0].message.content
-    except openai.error.APIError as e:
+        await ai_cache_put(cache_key, ai_response)
+        return ai_response
+    except openai.APIError as e:
         logger.error(f"OpenAI API Error: {e}")
         return "I'm having technical difficulties. Please try again later."
     except Exception as e:
@@ -209,14 +452,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
             "2. Ask me any question about faith or life\n"
             "3. Get biblical encouragement\n\n"
             "How are you feeling today?",
-            reply_markup=ReplyKeyboardMarkup(
-                keyboard=[
-                    ["1. Get verse", "2. Talk"],  # Numeric options like in image
-                    ["3. Help", "4. Cancel"]
-                ],
-                one_time_keyboard=True,
-                resize_keyboard=True
-            )
+            reply_markup=MAIN_MENU_KEYBOARD
         )
         return WAITING_FOR_EMOTION
     except Exception as e:
@@ -225,42 +461,36 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return ConversationHandler.END
 
 async def handle_emotion_choice(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle user's choice between verse or conversation"""
+    """Route the emotion state: verse menu, AI talk, or direct emotion"""
     try:
-        text = update.message.text.lower()
-        
+        raw = update.message.text
+        text = raw.casefold()
+
         if "verse" in text or "3874" in text:  # Added numeric code from image
             await update.message.reply_text(
                 "How are you feeling?",
-                reply_markup=ReplyKeyboardMarkup(
-                    [["Sad", "Anxious", "Lonely"], 
-                     ["Angry", "Scared", "Discouraged"]], 
-                    one_time_keyboard=True
-                )
+                reply_markup=EMOTION_KEYBOARD
             )
             return WAITING_FOR_EMOTION
         elif "talk" in text:
             await update.message.reply_text(
                 "I'm here to listen. What would you like to talk about?",
-                reply_markup=ReplyKeyboardMarkup([["/cancel"]], one_time_keyboard=True)
+                reply_markup=CANCEL_KEYBOARD
             )
             return GENERAL_CONVERSATION
-        elif text in [e.lower() for e in bible_references.keys()]:
+        elif (emotion := (raw if raw in bible_references else match_emotion(text))):
             # Handle direct emotion input
-            verse, message = get_bible_verse(text)
+            verse, message = await get_bible_verse(emotion)
             await update.message.reply_text(f"{verse}\n\n{message}")
             await update.message.reply_text(
                 "Would you like to talk more about this?",
-                reply_markup=ReplyKeyboardMarkup([["Yes", "No"]], one_time_keyboard=True)
+                reply_markup=YES_NO_KEYBOARD
             )
             return GENERAL_CONVERSATION
         else:
             await update.message.reply_text(
                 "Please choose 'I need a verse' or 'I want to talk'",
-                reply_markup=ReplyKeyboardMarkup(
-                    [["I need a verse"], ["I want to talk"]], 
-                    one_time_keyboard=True
-                )
+                reply_markup=CHOICE_KEYBOARD
             )
             return WAITING_FOR_EMOTION
     except Exception as e:
@@ -268,65 +498,50 @@ async def handle_emotion_choice(update: Update, context: ContextTypes.DEFAULT_TY
         await update.message.reply_text("Sorry, I didn't understand. Please try /start again.")
         return ConversationHandler.END
 
-async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle user messages for emotion-based verses"""
-    try:
-        text = update.message.text.lower()
-        if text in bible_references:
-            verse, message = get_bible_verse(text)
-            await update.message.reply_text(f"{verse}\n\n{message}")
-            await update.message.reply_text("Would you like to talk more about this?", 
-                                          reply_markup=ReplyKeyboardMarkup([["Yes", "No"]], one_time_keyboard=True))
-            return GENERAL_CONVERSATION if text == "yes" else WAITING_FOR_EMOTION
-        else:
-            await update.message.reply_text("Please choose one of the suggested emotions")
-            return WAITING_FOR_EMOTION
-    except Exception as e:
-        logger.error(f"Message handler error: {e}")
-        await update.message.reply_text("Sorry, I didn't understand that. Please try /start again.")
-        return ConversationHandler.END
-
 async def handle_conversation(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle general conversation with AI"""
     try:
         user_message = update.message.text
         
         # Handle cancellation
-        if user_message.lower() in ["no", "cancel"]:
+        if user_message.casefold() in ("no", "cancel"):
             await update.message.reply_text("Okay, no problem. Type /start whenever you'd like to talk again.")
             return ConversationHandler.END
             
-        # Show typing indicator
-        await context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing")
-        
-        # System prompt
-        system_prompt = """You are a compassionate Christian counselor. Respond with:
-        1. Relevant Bible verses (use format "Book Chapter:Verse")
-        2. Practical advice
-        3. Follow-up questions
-        Be kind, concise, and scripture-focused."""
-        
-        response = await openai.ChatCompletion.acreate(
+        # Serve repeat prompts from the cache before doing anything else
+        cache_key = ai_cache_key("gpt-3.5-turbo", user_message)
+        cached = await ai_cache_get(cache_key)
+        if cached is not None:
+            await update.message.reply_text(cached)
+            return GENERAL_CONVERSATION
+
+        # Fire the typing indicator without waiting for it, so its round-trip
+        # overlaps the completion call instead of delaying it
+        fire_and_forget(
+            context.bot.send_chat_action(chat_id=update.effective_chat.id, action="typing"),
+            "Typing indicator"
+        )
+
+        ai_response = await request_chat_completion(
+            cache_key,
             model="gpt-3.5-turbo",
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": user_message}
             ],
-            temperature=0.7,
             max_tokens=300
         )
-        
-        ai_response = response.choices[0].message.content
-        
+
         if not ai_response.strip():
             raise ValueError("Empty AI response")
-            
+
+        await ai_cache_put(cache_key, ai_response)
         await update.message.reply_text(ai_response)
         return GENERAL_CONVERSATION
         
     except Exception as e:
         logger.error(f"Conversation error: {e}")
-        verse, explanation = get_bible_verse('sad')
+        verse, explanation = await get_bible_verse('sad')
         await update.message.reply_text(f"I want to offer you this encouragement:\n\n{verse}\n\n{explanation}")
         return GENERAL_CONVERSATION
         
@@ -340,14 +555,24 @@ async def error_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Log errors and notify user"""
     logger.error(f"⚠️ Error: {context.error}")
     if update and update.message:
-        await update.message.reply_text("Sorry, something went wrong. Please try again.")
+        # Fire-and-forget: if Telegram itself is flaking, waiting on this
+        # reply would stall the error path for the full request timeout
+        fire_and_forget(
+            update.message.reply_text("Sorry, something went wrong. Please try again."),
+            "Error notification"
+        )
 
 async def post_init(application: Application):
     """Run after bot is initialized"""
+    global http_session
     try:
         logger.info(f"✅ Bot initialized - PID: {os.getpid()}")
+        # Shared HTTP session for all outbound API calls
+        http_session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10)
+        )
         # Verify single instance
-        if not await enforce_single_instance():
+        if not acquire_instance_lock():
             logger.error("Duplicate instance detected")
             await application.stop()
             sys.exit(1)
@@ -358,7 +583,14 @@ async def post_init(application: Application):
             ("cancel", "End conversation")
         ])
         logger.info("⌨️ Commands set up")
-        
+
+        # Health-check + webhook server on this same loop
+        await start_web_server()
+
+        # Warm the verse cache so first requests are served from memory
+        await asyncio.to_thread(_load_verse_cache)
+        await warm_verse_cache()
+
     except Exception as e:
         logger.error(f"Post-init error: {e}")
         raise
@@ -367,7 +599,9 @@ async def post_stop(application: Application):
     """Run before bot is stopped"""
     try:
         logger.info("🛑 Stopping bot...")
-        await cleanup_lock()
+        if http_session and not http_session.closed:
+            await http_session.close()
+        await asyncio.to_thread(_save_verse_cache)
     except Exception as e:
         logger.error(f"Post-stop error: {e}")
     finally:
@@ -375,29 +609,32 @@ async def post_stop(application: Application):
         
 async def run_bot():
     """Main bot running routine with proper lifecycle management"""
+    global telegram_app
     application = None
     try:
         # 1. Instance check
-        if not await enforce_single_instance():
+        if not acquire_instance_lock():
             logger.error("❌ Another instance is running. Exiting.")
             return
 
         # 2. Initialize application
         application = Application.builder() \
             .token(TELEGRAM_BOT_TOKEN) \
+            .concurrent_updates(True) \
             .post_init(post_init) \
             .post_stop(post_stop) \
             .build()
+        telegram_app = application
 
         # 3. Add handlers
         conv_handler = ConversationHandler(
             entry_points=[CommandHandler('start', start)],
             states={
                 WAITING_FOR_EMOTION: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, handle_emotion_choice)
+                    MessageHandler(TEXT_NO_COMMAND, handle_emotion_choice)
                 ],
                 GENERAL_CONVERSATION: [
-                    MessageHandler(filters.TEXT & ~filters.COMMAND, handle_conversation)
+                    MessageHandler(TEXT_NO_COMMAND, handle_conversation)
                 ]
             },
             fallbacks=[CommandHandler('cancel', cancel)],
@@ -408,21 +645,34 @@ async def run_bot():
 
         # 4. Start with clean state
         await application.initialize()
-        await application.bot.delete_webhook(drop_pending_updates=True)
-        
-        # 5. Start polling
-        logger.info("🔄 Starting polling...")
         await application.start()
-        await application.updater.start_polling(
-            poll_interval=3.0,
-            timeout=30,
-            drop_pending_updates=True,
-            allowed_updates=Update.ALL_TYPES
-        )
+
+        # 5. Receive updates: webhook when a public URL is configured,
+        # otherwise fall back to polling
+        if WEBHOOK_URL:
+            await application.bot.set_webhook(
+                url=f"{WEBHOOK_URL}/webhook",
+                secret_token=WEBHOOK_SECRET,
+                drop_pending_updates=True,
+                allowed_updates=Update.ALL_TYPES
+            )
+            logger.info("📬 Webhook registered, Telegram pushes updates")
+        else:
+            await application.bot.delete_webhook(drop_pending_updates=True)
+            logger.info("🔄 Starting polling...")
+            await application.updater.start_polling(
+                poll_interval=0.0,
+                timeout=50,
+                drop_pending_updates=True,
+                allowed_updates=Update.ALL_TYPES
+            )
         
-        # 6. Keep alive
-        while True:
-            await asyncio.sleep(1)
+        # 6. Keep alive until a shutdown signal arrives — no periodic wakeups
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop_event.set)
+        await stop_event.wait()
 
     except asyncio.CancelledError:
         logger.info("🛑 Received shutdown signal")
@@ -438,21 +688,22 @@ async def run_bot():
                 await application.shutdown()
             except Exception as e:
                 logger.error(f"Cleanup error: {e}")
-        await cleanup_lock()
+        if web_runner:
+            await web_runner.cleanup()
         logger.info("🎯 Cleanup complete")
 
 def main():
     """Synchronous entry point"""
-    
-    if not ensure_single_instance():
+
+    if not acquire_instance_lock():
         logger.error("❌ Another instance is already running. Exiting.")
         sys.exit(1)
-        
-    # Start Flask in a separate thread
-    threading.Thread(target=run_flask, daemon=True).start()
 
     # Run the bot with proper cleanup
     try:
+        if uvloop is not None:
+            uvloop.install()
+            logger.info("⚡ Using uvloop event loop")
         asyncio.run(run_bot())
     except KeyboardInterrupt:
         logger.info("🛑 Bot stopped by user")
@@ -461,9 +712,13 @@ def main():
     finally:
         logger.info("🏁 Application terminated")
 
-if __name__ == "__main__":
-    if not all([TELEGRAM_BOT_TOKEN, API_BIBLE_KEY, OPENAI_API_KEY]):
-        logger.error("❌ Missing required environment variables")
+def validate_config():
+    """Fail fast, naming any missing environment variables"""
+    missing = [name for name in REQUIRED_ENV_VARS if not os.getenv(name)]
+    if missing:
+        logger.error(f"❌ Missing required environment variables: {', '.join(missing)}")
         sys.exit(1)
-        
+
+if __name__ == "__main__":
+    validate_config()
     main()